@@ -11,7 +11,7 @@ Original file is located at
 """
 parse_initial_solution.py
 Parses initialSolution.in into:
- - pairings.csv           (pairing_id, base, legs_as_semicolon_separated)
+ - pairings.csv           (pairing_index, pairing_id, base, legs_as_semicolon_separated, is_initial)
  - legs.csv               (leg_index, leg_id)
  - incidence.csv          (leg_index, pairing_index)
  - pairing_legs_expanded.csv (pairing_index, pairing_id, leg_index, leg_id)
@@ -114,9 +114,11 @@ def main(path):
     # write pairings.csv
     with open('pairings.csv', 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        writer.writerow(['pairing_index','pairing_id','base','legs_semicolon'])
+        # every pairing here comes from the initial solution; the solver uses
+        # is_initial as its MIP start
+        writer.writerow(['pairing_index','pairing_id','base','legs_semicolon','is_initial'])
         for p_index, (pid, base, legs) in enumerate(pairings):
-            writer.writerow([p_index, pid, base, ';'.join(legs)])
+            writer.writerow([p_index, pid, base, ';'.join(legs), 1])
 
     # write legs.csv
     with open('legs.csv', 'w', newline='', encoding='utf-8') as f:
@@ -22,18 +22,42 @@ for repeatable batch execution.
 
 
 
+import os
 import time
 import json
 import random
 import re
+from array import array
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+    from numba import njit, types
+    from numba.typed import Dict as NumbaDict
+    HAVE_NUMBA = True
+except ImportError:
+    # the pure-Python sampler below covers every mode without numba
+    HAVE_NUMBA = False
+
+_PAIRING_RE = re.compile(rb'Pairing\s+(\d+)\s*:\s*Base\s+(\w+)\s*:\s*([^;]+);')
+
+# 64-bit FNV-1a parameters used to key candidate duty sequences
+_FNV_OFFSET = 14695981039346656037
+_FNV_PRIME = 1099511628211
+_MASK64 = (1 << 64) - 1
+
 
 
 def parse_solution(filepath):
 
-        """
+    """
     Parse an initial pairing solution file into a normalized in-memory
     representation.
 
@@ -54,16 +78,16 @@ def parse_solution(filepath):
             - base: crew base
             - duties: ordered list of duty strings
     """
-    pattern = r'Pairing\s+(\d+)\s*:\s*Base\s+(\w+)\s*:\s*([^;]+);'
-    with open(filepath, 'r') as f:
+    with open(filepath, 'rb') as f:
         text = f.read()
 
     pairings = []
-    for pid, base, duties in re.findall(pattern, text):
+    for m in _PAIRING_RE.finditer(text):
+        duties = [d.strip() for d in m.group(3).decode().split(",")]
         pairings.append({
-            "id": f"SOL_{pid}",
-            "base": base,
-            "duties": [d.strip() for d in duties.split(",") if d.strip()],
+            "id": f"SOL_{m.group(1).decode()}",
+            "base": m.group(2).decode(),
+            "duties": [d for d in duties if d],
         })
     return pairings
 
@@ -72,7 +96,7 @@ def parse_solution(filepath):
 
 def cheap_cost(duties):
 
-        """
+    """
     Assign a simple proxy cost to a pairing based solely on length.
 
     This is intentionally crude and is only meant to provide a consistent,
@@ -98,7 +122,7 @@ def cheap_cost(duties):
 
 def local_perturb(pairing):
 
-        """
+    """
     Generate small structural variations of a single pairing.
 
     The perturbations are conservative by design: removing interior
@@ -106,6 +130,11 @@ def local_perturb(pairing):
     candidates close to the original solution while still exploring
     nearby alternatives.
 
+    Candidates are returned as index windows over the pairing's duties
+    rather than as new lists, so callers can hash and discard duplicates
+    without allocating. A window (lo, hi, skip) stands for
+    duties[lo:hi] with position skip removed (skip == -1 removes nothing).
+
     Parameters
     ----------
     pairing : dict
@@ -113,33 +142,31 @@ def local_perturb(pairing):
 
     Returns
     -------
-    list of list
-        Candidate duty sequences derived from the original.
+    list of tuple
+        Candidate (lo, hi, skip) windows derived from the original.
     """
-    
-    d = pairing["duties"]
+    n = len(pairing["duties"])
     out = []
 
-    if len(d) > 2:
-        out.append(d[1:])
-        out.append(d[:-1])
+    if n > 2:
+        out.append((1, n, -1))
+        out.append((0, n - 1, -1))
 
-    for i in range(1, len(d) - 1):
-        nd = d[:i] + d[i+1:]
-        if len(nd) >= 2:
-            out.append(nd)
+        # dropping one interior duty leaves n - 1 >= 2 duties
+        for i in range(1, n - 1):
+            out.append((0, n, i))
 
-    mid = len(d) // 2
-    if mid >= 2 and len(d) - mid >= 2:
-        out.append(d[:mid])
-        out.append(d[mid:])
+    mid = n // 2
+    if mid >= 2 and n - mid >= 2:
+        out.append((0, mid, -1))
+        out.append((mid, n, -1))
 
     return out
 
 
 def forced_duty_generators(solution):
 
-        """
+    """
     Identify low-frequency (“forced”) duties and the pairings that contain them.
 
     A forced duty is defined here as a duty that appears exactly once
@@ -159,16 +186,17 @@ def forced_duty_generators(solution):
         by_duty : dict
             Mapping from forced duty to pairings that contain it.
     """
-    freq = Counter()
-    for p in solution:
-        freq.update(p["duties"])
+    freq = Counter(d for p in solution for d in p["duties"])
 
+    # keep first-seen order in the list so seeded sampling stays reproducible;
+    # the set is only for O(1) membership tests
     forced = [d for d, c in freq.items() if c == 1]
+    forced_set = set(forced)
     by_duty = defaultdict(list)
 
     for p in solution:
         for d in p["duties"]:
-            if d in forced:
+            if d in forced_set:
                 by_duty[d].append(p)
 
     return forced, by_duty
@@ -176,7 +204,7 @@ def forced_duty_generators(solution):
 
 def forced_alternative(duty, source_pairing):
 
-       """
+    """
     Construct a minimal alternative pairing around a forced duty.
 
     The intent is to keep the forced duty covered while shortening or
@@ -207,6 +235,187 @@ def forced_alternative(duty, source_pairing):
     return None
 
 
+def _batched_choices(population, batch=4096):
+
+    """
+    Yield an endless stream of uniform draws from population.
+
+    Draws are taken with random.choices in blocks, which amortizes the
+    per-call overhead of random.choice inside the sampling loop.
+    """
+    while True:
+        yield from random.choices(population, k=batch)
+
+
+# --------------------------------------------------
+# JIT local sampler (used only when numba is available)
+# --------------------------------------------------
+
+if HAVE_NUMBA:
+
+    @njit(cache=True)
+    def _seed_jit(seed):
+        np.random.seed(seed)
+
+    @njit(cache=True)
+    def _fnv1a(ids, lo, hi, skip):
+        # 64-bit FNV-1a over the int32 duty ids in ids[lo:hi], omitting ids[skip]
+        h = np.uint64(_FNV_OFFSET)
+        for k in range(lo, hi):
+            if k != skip:
+                h = (h ^ np.uint64(ids[k])) * np.uint64(_FNV_PRIME)
+        return h
+
+    @njit(cache=True)
+    def _mark_seen(duty_ids, offsets, seen_hashes):
+        for s in range(len(offsets) - 1):
+            seen_hashes[_fnv1a(duty_ids, offsets[s], offsets[s + 1], -1)] = np.uint8(1)
+
+    @njit(cache=True)
+    def _sample_local(duty_ids, offsets, seen_hashes, out_ids, out_offsets,
+                      n_out, target, n_draws):
+        """
+        Run up to n_draws local perturbations on the CSR-encoded solution.
+
+        Candidates mirror local_perturb (trim either end, drop one interior
+        duty, split in half) and are described by (lo, hi, skip) windows so
+        nothing is copied unless the hashed window is new. Accepted windows
+        are appended to out_ids/out_offsets.
+
+        Returns
+        -------
+        int
+            Updated number of accepted candidates.
+        """
+        n_src = len(offsets) - 1
+
+        for _ in range(n_draws):
+            s = np.random.randint(0, n_src)
+            a = offsets[s]
+            b = offsets[s + 1]
+            L = b - a
+            mid = L // 2
+
+            n_trim = 2 if L > 2 else 0
+            n_skip = L - 2 if L > 2 else 0
+            n_half = 2 if mid >= 2 and L - mid >= 2 else 0
+
+            for c in range(n_trim + n_skip + n_half):
+                skip = -1
+                if c < n_trim:
+                    lo = a + 1 - c
+                    hi = b - c
+                elif c < n_trim + n_skip:
+                    lo = a
+                    hi = b
+                    skip = a + 1 + (c - n_trim)
+                elif c == n_trim + n_skip:
+                    lo = a
+                    hi = a + mid
+                else:
+                    lo = a + mid
+                    hi = b
+
+                h = _fnv1a(duty_ids, lo, hi, skip)
+                if h in seen_hashes:
+                    continue
+                seen_hashes[h] = np.uint8(1)
+
+                pos = out_offsets[n_out]
+                for k in range(lo, hi):
+                    if k != skip:
+                        out_ids[pos] = duty_ids[k]
+                        pos += 1
+                out_offsets[n_out + 1] = pos
+                n_out += 1
+
+                if n_out >= target:
+                    return n_out
+
+        return n_out
+
+
+_jit_ready = False
+
+
+def _warm_up_jit():
+    """
+    Compile (or load from cache) the numba kernels on a tiny input.
+
+    Called before generate_sample starts its clock, so JIT compilation
+    is not billed to the time limit or the reported elapsed time. Runs
+    once per process.
+    """
+    global _jit_ready
+    if _jit_ready:
+        return
+
+    duty_ids = np.zeros(2, dtype=np.int32)
+    offsets = np.array([0, 2], dtype=np.int64)
+    seen_hashes = NumbaDict.empty(key_type=types.uint64, value_type=types.uint8)
+    _seed_jit(0)
+    _mark_seen(duty_ids, offsets, seen_hashes)
+    _sample_local(duty_ids, offsets, seen_hashes, np.zeros(2, dtype=np.int32),
+                  np.zeros(2, dtype=np.int64), 0, 1, 0)
+    _jit_ready = True
+
+
+def _generate_local_jit(solution, pool, target_size, time_limit, start, seed):
+    """
+    Numba-backed equivalent of the "local" branch of generate_sample.
+
+    Duties are encoded as int32 ids and the solution as a CSR layout
+    (duty_ids, offsets); the sampling kernel runs in short batches so the
+    wall-clock limit is still honoured. Results are decoded back to duty
+    strings and appended to the pool arrays in place.
+    """
+    duty_to_id = {}
+    for p in solution:
+        for d in p["duties"]:
+            duty_to_id.setdefault(d, len(duty_to_id))
+    id_to_duty = list(duty_to_id)
+
+    offsets = np.zeros(len(solution) + 1, dtype=np.int64)
+    for i, p in enumerate(solution):
+        offsets[i + 1] = offsets[i] + len(p["duties"])
+    duty_ids = np.fromiter(
+        (duty_to_id[d] for p in solution for d in p["duties"]),
+        dtype=np.int32, count=offsets[-1]
+    )
+
+    seen_hashes = NumbaDict.empty(key_type=types.uint64, value_type=types.uint8)
+    _mark_seen(duty_ids, offsets, seen_hashes)
+
+    target = target_size - len(pool["bases"])
+    max_len = int(np.diff(offsets).max()) if len(solution) else 0
+    out_ids = np.empty(max(target, 0) * max_len, dtype=np.int32)
+    out_offsets = np.zeros(max(target, 0) + 1, dtype=np.int64)
+
+    _seed_jit(seed)
+    n_out = 0
+    while n_out < target and time.time() - start < time_limit:
+        n_out = _sample_local(duty_ids, offsets, seen_hashes, out_ids,
+                              out_offsets, n_out, target, 10_000)
+
+    base_offset = pool["offsets"][-1]
+    starts = (out_offsets[:n_out] + base_offset).tolist()
+    lengths = np.diff(out_offsets[:n_out + 1]).tolist()
+    flat = pool["flat"]
+    pool["bases"].extend(random.choices([p["base"] for p in solution], k=n_out))
+    flat.extend(id_to_duty[i] for i in out_ids[:out_offsets[n_out]].tolist())
+    pool["offsets"].extend((out_offsets[1:n_out + 1] + base_offset).tolist())
+
+    # proxy cost depends only on length; call cheap_cost once per length
+    cost_by_len = {}
+    for lo, n in zip(starts, lengths):
+        cost = cost_by_len.get(n)
+        if cost is None:
+            cost = cost_by_len[n] = cheap_cost(flat[lo:lo + n])
+        pool["costs"].append(cost)
+
+    return pool, time.time() - start
+
+
 def generate_sample(
     solution,
     target_size,
@@ -238,84 +447,214 @@ def generate_sample(
     Returns
     -------
     tuple
-        pool : list of dict
-            Generated pairing candidates with bases and costs.
+        pool : dict
+            Generated pairing candidates as parallel arrays: "bases",
+            "costs", and the duties of pairing k in
+            flat[offsets[k]:offsets[k + 1]]. The original solution
+            pairings come first and their "SOL_<n>" ids are listed in
+            "ids"; write_pool_jsonl flags them with "is_initial".
         elapsed : float
             Wall-clock time spent generating samples.
     """
+    # the pool starts as the solution itself, so there is nothing to sample
+    # (and no kernel to compile) once it already meets target_size
+    use_jit = (mode == "local" and HAVE_NUMBA
+               and 0 < len(solution) < target_size)
+    if use_jit:
+        _warm_up_jit()
+
     random.seed(seed)
     start = time.time()
 
-    pool = []
-    seen = set()
+    pool = {
+        "ids": [],
+        "bases": [],
+        "flat": [],
+        "offsets": array("q", [0]),
+        "costs": array("i"),
+    }
+    bases, flat, offsets, costs = (pool["bases"], pool["flat"],
+                                   pool["offsets"], pool["costs"])
+    seen_hashes = set()
+
+    # every candidate is built from solution duties, so ids assigned here
+    # cover everything the sampler can produce
+    duty_id = {}
+    for p in solution:
+        for d in p["duties"]:
+            duty_id.setdefault(d, len(duty_id))
 
     # always include solution pairings
     for p in solution:
-        key = tuple(p["duties"])
-        seen.add(key)
-        pool.append({
-            "base": p["base"],
-            "duties": p["duties"],
-            "cost": cheap_cost(p["duties"])
-        })
+        h = _FNV_OFFSET
+        for x in p["duties"]:
+            h = ((h ^ duty_id[x]) * _FNV_PRIME) & _MASK64
+        seen_hashes.add(h)
+        pool["ids"].append(p["id"])
+        bases.append(p["base"])
+        flat.extend(p["duties"])
+        offsets.append(len(flat))
+        costs.append(cheap_cost(p["duties"]))
+
+    if len(bases) >= target_size:
+        return pool, time.time() - start
+
+    if use_jit:
+        return _generate_local_jit(solution, pool, target_size, time_limit, start, seed)
 
     forced, forced_map = forced_duty_generators(solution)
 
-    while len(pool) < target_size and time.time() - start < time_limit:
+    # block-drawn RNG streams for the per-iteration choices
+    base_draws = _batched_choices([p["base"] for p in solution])
+    src_draws = _batched_choices(solution)
+    forced_draws = _batched_choices(forced)
+
+    # proxy cost depends only on length
+    cost_by_len = {}
+
+    # local_perturb is deterministic per source and solution is fixed,
+    # so each pairing's windows are computed at most once
+    perturb_cache = {}
+
+    # each iteration proposes (lo, hi, skip) windows over one sequence;
+    # a window is only sliced into a new list once its hash is unseen
+    while len(bases) < target_size and time.time() - start < time_limit:
         if mode == "local":
-            src = random.choice(solution)
-            candidates = local_perturb(src)
+            src = next(src_draws)
+            seq = src["duties"]
+            windows = perturb_cache.get(id(src))
+            if windows is None:
+                windows = perturb_cache[id(src)] = local_perturb(src)
 
         elif mode == "forced":
-            d = random.choice(forced)
+            d = next(forced_draws)
             src = random.choice(forced_map[d])
-            alt = forced_alternative(d, src)
-            candidates = [alt] if alt else []
+            seq = forced_alternative(d, src) or []
+            windows = [(0, len(seq), -1)]
 
         elif mode == "mixed":
             r = random.random()
             if r < 0.6:
-                src = random.choice(solution)
-                candidates = local_perturb(src)
+                src = next(src_draws)
+                seq = src["duties"]
+                windows = perturb_cache.get(id(src))
+                if windows is None:
+                    windows = perturb_cache[id(src)] = local_perturb(src)
             elif r < 0.9:
-                d = random.choice(forced)
+                d = next(forced_draws)
                 src = random.choice(forced_map[d])
-                alt = forced_alternative(d, src)
-                candidates = [alt] if alt else []
+                seq = forced_alternative(d, src) or []
+                windows = [(0, len(seq), -1)]
             else:
                 # mild random recombination
                 p1, p2 = random.sample(solution, 2)
                 cut = min(len(p1["duties"]), len(p2["duties"])) // 2
-                candidates = [p1["duties"][:cut] + p2["duties"][cut:]]
+                seq = p1["duties"][:cut] + p2["duties"][cut:]
+                windows = [(0, len(seq), -1)]
 
         else:
             raise ValueError(f"Unknown mode {mode}")
 
-        for d in candidates:
-            if not d or len(d) < 2:
+        for lo, hi, skip in windows:
+            if hi - lo - (skip >= 0) < 2:
                 continue
 
-            key = tuple(d)
-            if key in seen:
+            h = _FNV_OFFSET
+            for k in range(lo, hi):
+                if k != skip:
+                    h = ((h ^ duty_id[seq[k]]) * _FNV_PRIME) & _MASK64
+            if h in seen_hashes:
                 continue
 
-            seen.add(key)
-            pool.append({
-                "base": random.choice(solution)["base"],
-                "duties": d,
-                "cost": cheap_cost(d)
-            })
+            seen_hashes.add(h)
+            d = seq[lo:skip] + seq[skip + 1:hi] if skip >= 0 else seq[lo:hi]
+            flat.extend(d)
+            offsets.append(len(flat))
+            bases.append(next(base_draws))
 
-            if len(pool) >= target_size:
+            cost = cost_by_len.get(len(d))
+            if cost is None:
+                cost = cost_by_len[len(d)] = cheap_cost(d)
+            costs.append(cost)
+
+            if len(bases) >= target_size:
                 break
 
     return pool, time.time() - start
 
 
+def write_pool_jsonl(pool, path):
+
+    """
+    Write a generated pool as JSON Lines, one pairing record per line.
+
+    Records are serialized compactly and streamed to disk, so a 500K
+    pool never has to exist as one pretty-printed string. orjson is used
+    when installed; otherwise the stdlib encoder produces the same lines.
+    Read back with ``[json.loads(line) for line in f]``.
+
+    Every record has the same keys: "id", "is_initial", "base",
+    "duties" and "cost". The leading initial-solution pairings carry
+    their SOL_<n> id and "is_initial": true, the same flag the solver
+    reads from the is_initial column of pairings.csv as its warm start;
+    generated pairings have "id": null and "is_initial": false.
+
+    Parameters
+    ----------
+    pool : dict
+        Pairing arrays as returned by generate_sample.
+    path : str or Path
+        Output file path.
+    """
+    ids, bases, flat, offsets, costs = (pool["ids"], pool["bases"], pool["flat"],
+                                        pool["offsets"], pool["costs"])
+
+    def records():
+        for k in range(len(bases)):
+            initial = k < len(ids)
+            yield {
+                "id": ids[k] if initial else None,
+                "is_initial": initial,
+                "base": bases[k],
+                "duties": flat[offsets[k]:offsets[k + 1]],
+                "cost": costs[k],
+            }
+
+    if orjson is not None:
+        with open(path, "wb") as f:
+            for rec in records():
+                f.write(orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for rec in records():
+                f.write(json.dumps(rec, separators=(",", ":"), ensure_ascii=False))
+                f.write("\n")
+
+
 # --------------------------------------------------
 # Main driver
 # --------------------------------------------------
 
+def _run_config(solution, name, target, time_limit, mode, dirpath):
+
+    """
+    Generate and write one (size, mode) pool; used as a worker job.
+
+    The pool is written from inside the worker so only a short summary
+    travels back to the parent process.
+    """
+    pool, elapsed = generate_sample(
+        solution,
+        target_size=max(target, len(solution)),
+        time_limit=time_limit,
+        mode=mode,
+        seed=42
+    )
+
+    write_pool_jsonl(pool, dirpath / f"{mode}.jsonl")
+    return name, mode, len(pool["bases"]), elapsed
+
+
 if __name__ == "__main__":
     solution = parse_solution("/content/sample_data/initialSolution.txt")
 
@@ -330,24 +669,22 @@ if __name__ == "__main__":
     out_root = Path("samples")
     out_root.mkdir(exist_ok=True)
 
-    for name, target, time_limit in configs:
-        dirpath = out_root / f"size_{name}"
-        dirpath.mkdir(exist_ok=True)
-
-        print(f"\n=== Generating {name} samples ===")
+    # every (size, mode) run only reads the fixed solution, so they are
+    # independent and can run in parallel
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        futures = []
+        for name, target, time_limit in configs:
+            dirpath = out_root / f"size_{name}"
+            dirpath.mkdir(exist_ok=True)
 
-        for mode in modes:
-            pool, elapsed = generate_sample(
-                solution,
-                target_size=max(target, len(solution)),
-                time_limit=time_limit,
-                mode=mode,
-                seed=42
-            )
+            for mode in modes:
+                futures.append(ex.submit(
+                    _run_config, solution, name, target, time_limit, mode, dirpath
+                ))
 
-            outfile = dirpath / f"{mode}.json"
-            with open(outfile, "w") as f:
-                json.dump(pool, f, indent=2)
+        print(f"\n=== Generating {len(futures)} sample pools ===")
 
-            print(f"{mode:>6}: {len(pool):>7} pairings "
+        for fut in as_completed(futures):
+            name, mode, size, elapsed = fut.result()
+            print(f"{name:>5} {mode:>6}: {size:>7} pairings "
                   f"in {elapsed:5.1f}s")
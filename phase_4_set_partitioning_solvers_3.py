@@ -8,9 +8,9 @@ cost data, and includes basic infeasibility diagnostics to aid data validation a
 
 MODEL LOGIC:
 
-# constraints: each leg at least once
+# constraints: each leg exactly once (incidence stored per leg in CSR form)
 for i in range(self.m):
-    prob += lpSum(self.a[i][j] * x[j] for j in range(self.n)) >= 1
+    prob += LpAffineExpression([(x[j], 1) for j in leg_pairings[leg_indptr[i]:leg_indptr[i + 1]]]) == 1
 
 
 
@@ -21,9 +21,16 @@ for i in range(self.m):
 
 import csv
 from pathlib import Path
+import numpy as np
 import pulp
 import sys
 
+try:
+    import highspy
+except ImportError:
+    # solve_spp falls back to PuLP + CBC
+    highspy = None
+
 
 class SPPFromCSV:
     def __init__(self, instance_folder):
@@ -35,13 +42,17 @@ class SPPFromCSV:
         partially specified inputs and infer missing structures when necessary.
         """
         self.instance_folder = Path(instance_folder)
-        self.pairings = []           # dict list: {pairing_index, pairing_id, base, legs}
+        self.pairings = []           # dict list: {pairing_index, orig_index, pairing_id, base, legs, leg_ids}
         self.legs = []               # list of leg_id strings
         self.leg_to_index = {}       # map leg_id -> leg_index
+        self.initial = []            # pairing indices flagged is_initial in pairings.csv (warm start)
+        self.orig_to_index = {}      # map pairing_index in the CSVs -> internal pairing_index
+        self.unresolved_legs = {}    # pairing_index -> leg strings not found in legs.csv at load time
         self.n = 0                   # number of pairings
         self.m = 0                   # number of legs
         self.c = []                  # pairing costs
-        self.a = None                # incidence matrix (m x n)
+        self.leg_indptr = None       # CSR offsets per leg (m + 1)
+        self.leg_pairings = None     # CSR pairing indices, grouped by leg
 
     # ============================================================
     #  LOAD legs.csv
@@ -58,19 +69,20 @@ class SPPFromCSV:
 
         leg_rows = []
         with open(path, newline="", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            fields = [h.strip() for h in reader.fieldnames]
+            reader = csv.reader(f)
+            fields = [h.strip() for h in next(reader, [])]
 
             # Identify leg id column
             leg_id_col = None
-            for h in fields:
+            for i, h in enumerate(fields):
                 if h.lower() in ("leg_id", "leg"):
-                    leg_id_col = h
-            if not leg_id_col:
+                    leg_id_col = i
+            if leg_id_col is None:
                 raise ValueError("legs.csv must contain a 'leg_id' column.")
 
             for row in reader:
-                leg_rows.append(row[leg_id_col].strip())
+                if row:
+                    leg_rows.append(row[leg_id_col].strip())
 
         self.legs = leg_rows
         self.leg_to_index = {leg: i for i, leg in enumerate(self.legs)}
@@ -92,58 +104,83 @@ class SPPFromCSV:
             raise FileNotFoundError(f"pairings.csv not found at {path}")
 
         pairings = []
+        initial = []
+        unresolved = {}
         with open(path, newline="", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            fields = [h.strip() for h in reader.fieldnames]
+            reader = csv.reader(f)
+            fields = [h.strip() for h in next(reader, [])]
 
             # Identify columns
             idx_col = None
             id_col = None
             base_col = None
             legs_col = None
+            initial_col = None
 
-            for h in fields:
+            for i, h in enumerate(fields):
                 low = h.lower()
                 if low in ("pairing_index", "index"):
-                    idx_col = h
+                    idx_col = i
                 elif low in ("pairing_id", "id"):
-                    id_col = h
+                    id_col = i
                 elif low == "base":
-                    base_col = h
+                    base_col = i
                 elif low in ("legs_semicolon", "legs", "legs_list"):
-                    legs_col = h
-
-            auto_idx = 0
+                    legs_col = i
+                elif low == "is_initial":
+                    initial_col = i
 
             for row in reader:
-                # pairing index
-                pairing_index = int(row[idx_col]) if idx_col and row[idx_col].strip() else auto_idx
-                auto_idx += 1
+                if not row:
+                    continue
+
+                # pairing index follows file order; any index column is kept only to
+                # cross-reference incidence.csv / costs.csv
+                pairing_index = len(pairings)
+                orig_index = int(row[idx_col]) if idx_col is not None and row[idx_col].strip() else pairing_index
 
-                pairing_id = row[id_col].strip() if id_col and row[id_col].strip() else str(pairing_index)
-                base = row[base_col].strip() if base_col and row[base_col].strip() else None
+                pairing_id = row[id_col].strip() if id_col is not None and row[id_col].strip() else str(orig_index)
+                base = row[base_col].strip() if base_col is not None and row[base_col].strip() else None
 
                 legs = []
-                if legs_col and row[legs_col].strip():
+                if legs_col is not None and row[legs_col].strip():
                     raw = row[legs_col].strip()
-                    if ";" in raw:
-                        legs = [t.strip() for t in raw.split(";") if t.strip()]
+                    tokens = raw.split(";" if ";" in raw else ",")
+                    # only pay for per-token strips when the field has inner whitespace;
+                    # space is the only whitespace isprintable() accepts, so this also
+                    # catches tabs, newlines and non-breaking spaces
+                    if " " in raw or not raw.isprintable():
+                        legs = [t for t in map(str.strip, tokens) if t]
                     else:
-                        legs = [t.strip() for t in raw.split(",") if t.strip()]
+                        legs = [t for t in tokens if t]
+
+                # encode legs once here so incidence building never touches leg strings;
+                # legs missing from legs.csv are left for infer_incidence to resolve, since
+                # legs.csv stays authoritative when incidence.csv is supplied
+                leg_ids = []
+                for leg in dict.fromkeys(legs):
+                    li = self.leg_to_index.get(leg)
+                    if li is None:
+                        unresolved.setdefault(pairing_index, []).append(leg)
+                    else:
+                        leg_ids.append(li)
+
+                if initial_col is not None and row[initial_col].strip().lower() in ("1", "true", "yes"):
+                    initial.append(pairing_index)
 
                 pairings.append({
                     "pairing_index": pairing_index,
+                    "orig_index": orig_index,
                     "pairing_id": pairing_id,
                     "base": base,
-                    "legs": legs
+                    "legs": legs,
+                    "leg_ids": np.array(leg_ids, dtype=np.int32)
                 })
 
-        # sort and normalize indices
-        pairings.sort(key=lambda p: p["pairing_index"])
-        for new_idx, p in enumerate(pairings):
-            p["pairing_index"] = new_idx
-
         self.pairings = pairings
+        self.orig_to_index = {p["orig_index"]: p["pairing_index"] for p in pairings}
+        self.initial = initial
+        self.unresolved_legs = unresolved
         self.n = len(pairings)
         print(f"Loaded {self.n} pairings")
 
@@ -161,27 +198,31 @@ class SPPFromCSV:
             print("No incidence.csv found. Will infer from pairings instead.")
             return False
 
-        self.a = [[0] * self.n for _ in range(self.m)]
+        entries = set()
 
         with open(path, newline="", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            fields = [h.strip() for h in reader.fieldnames]
+            reader = csv.reader(f)
+            fields = [h.strip() for h in next(reader, [])]
 
             li_col = None
             pj_col = None
 
-            for h in fields:
+            for i, h in enumerate(fields):
                 if h.lower() in ("leg_index", "leg"):
-                    li_col = h
+                    li_col = i
                 if h.lower() in ("pairing_index", "pairing"):
-                    pj_col = h
+                    pj_col = i
 
             for row in reader:
+                if not row:
+                    continue
                 li = int(row[li_col])
-                pj = int(row[pj_col])
-                if 0 <= li < self.m and 0 <= pj < self.n:
-                    self.a[li][pj] = 1
+                pj = self.orig_to_index.get(int(row[pj_col]))
+                if 0 <= li < self.m and pj is not None:
+                    entries.add((li, pj))
 
+        entries = sorted(entries, key=lambda e: e[1])
+        self._build_leg_csr([li for li, _ in entries], [pj for _, pj in entries])
         print("Loaded incidence matrix from incidence.csv")
         return True
 
@@ -190,30 +231,52 @@ class SPPFromCSV:
     # ============================================================
     def infer_incidence(self):
         """
-        Constructs the leg–pairing incidence matrix directly from the leg lists embedded in each pairing.
-        Any previously unseen legs encountered during this process are added dynamically, expanding the leg universe to ensure 
-        model feasibility rather than failing early.
+        Constructs the leg–pairing incidence matrix directly from the leg ids encoded for each pairing at load time.
+        Any legs not in legs.csv are added here, expanding the leg universe to ensure model feasibility rather than
+        failing early; after that, building the matrix is a single vectorized pass with no string lookups.
         """
         print("Inferring incidence from pairings...")
         # ensure all legs exist
-        for p in self.pairings:
-            for leg in p["legs"]:
-                if leg not in self.leg_to_index:
+        for pj, legs in self.unresolved_legs.items():
+            extra = []
+            for leg in legs:
+                li = self.leg_to_index.get(leg)
+                if li is None:
                     print(f"WARNING: leg {leg} not in legs.csv — adding it.")
-                    self.leg_to_index[leg] = self.m
+                    li = self.leg_to_index[leg] = self.m
                     self.legs.append(leg)
                     self.m += 1
+                extra.append(li)
+            p = self.pairings[pj]
+            p["leg_ids"] = np.concatenate([p["leg_ids"], np.array(extra, dtype=np.int32)])
+        self.unresolved_legs = {}
 
-        # build matrix
-        self.a = [[0] * self.n for _ in range(self.m)]
-        for p in self.pairings:
-            pj = p["pairing_index"]
-            for leg in p["legs"]:
-                li = self.leg_to_index[leg]
-                self.a[li][pj] = 1
+        lengths = [len(p["leg_ids"]) for p in self.pairings]
+        leg_idx = np.concatenate([p["leg_ids"] for p in self.pairings] or [np.empty(0, dtype=np.int32)])
+        pairing_idx = np.repeat(np.array([p["pairing_index"] for p in self.pairings], dtype=np.int32), lengths)
 
+        self._build_leg_csr(leg_idx, pairing_idx)
         print("Incidence matrix constructed.")
 
+    def _build_leg_csr(self, leg_idx, pairing_idx):
+        """
+        Packs parallel (leg_index, pairing_index) sequences into per-leg CSR int32 arrays.
+        Each pairing touches only a handful of legs, so storing the nonzeros alone keeps memory and constraint
+        construction proportional to the number of leg-pairing incidences rather than m x n.
+        """
+        leg_idx = np.asarray(leg_idx, dtype=np.int32)
+        pairing_idx = np.asarray(pairing_idx, dtype=np.int32)
+
+        # per-leg degree sizes the offsets
+        indptr = np.zeros(self.m + 1, dtype=np.int32)
+        np.cumsum(np.bincount(leg_idx, minlength=self.m), out=indptr[1:])
+
+        # stable sort keeps each leg's slice in pairing order
+        order = np.argsort(leg_idx, kind="stable")
+
+        self.leg_indptr = indptr
+        self.leg_pairings = pairing_idx[order]
+
     # ============================================================
     #  LOAD costs.csv (optional)
     # ============================================================
@@ -233,84 +296,217 @@ class SPPFromCSV:
         self.c = [len(p["legs"]) for p in self.pairings]
 
         with open(path, newline="", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            fields = [h.strip() for h in reader.fieldnames]
+            reader = csv.reader(f)
+            fields = [h.strip() for h in next(reader, [])]
 
             idx_col = None
             id_col = None
             cost_col = None
 
-            for h in fields:
+            for i, h in enumerate(fields):
                 low = h.lower()
                 if low in ("pairing_index", "index"):
-                    idx_col = h
+                    idx_col = i
                 elif low in ("pairing_id", "id"):
-                    id_col = h
+                    id_col = i
                 elif "cost" in low:
-                    cost_col = h
+                    cost_col = i
+
+            # first pairing wins for duplicated ids
+            id_to_index = {}
+            for p in self.pairings:
+                id_to_index.setdefault(p["pairing_id"], p["pairing_index"])
 
             for row in reader:
                 # resolve pairing index
-                if idx_col and row[idx_col].strip():
-                    pj = int(row[idx_col])
-                elif id_col and row[id_col].strip():
-                    pid = row[id_col].strip()
-                    pj = next((p["pairing_index"] for p in self.pairings if p["pairing_id"] == pid), None)
+                if not row:
+                    continue
+                if idx_col is not None and row[idx_col].strip():
+                    pj = self.orig_to_index.get(int(row[idx_col]))
+                elif id_col is not None and row[id_col].strip():
+                    pj = id_to_index.get(row[id_col].strip())
                 else:
                     continue
 
-                if 0 <= pj < self.n:
+                if pj is not None and 0 <= pj < self.n:
                     self.c[pj] = float(row[cost_col])
 
         print("Loaded costs from costs.csv")
 
+    # ============================================================
+    #  Remove duplicate columns
+    # ============================================================
+    def dedupe_pairings(self):
+        """
+        Drops pairings that cover exactly the same set of legs as another pairing, keeping the cheapest one.
+        Sampled pools often contain different duty orderings with identical coverage; these are duplicate SPP columns
+        that only enlarge the model. Leg sets are read from the incidence, so this works whether it was loaded from
+        incidence.csv or inferred. Must run after incidence and costs are available.
+        Surviving pairings are renumbered 0..n'-1 internally but keep their orig_index, which is what solve_spp
+        returns, so results still refer to pairings.csv.
+        """
+        n = self.n
+        leg_ids = np.repeat(np.arange(self.m, dtype=np.int32), np.diff(self.leg_indptr))
+
+        # column view of the incidence: legs of each pairing, ascending
+        order = np.argsort(self.leg_pairings, kind="stable")
+        col_legs = leg_ids[order]
+        col_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.leg_pairings, minlength=n), out=col_ptr[1:])
+
+        keys = [col_legs[col_ptr[j]:col_ptr[j + 1]].tobytes() for j in range(n)]
+        best = {}
+        for j, k in enumerate(keys):
+            b = best.get(k)
+            if b is None or self.c[j] < self.c[b]:
+                best[k] = j
+
+        keep = sorted(best.values())
+        if len(keep) == n:
+            return
+
+        new_index = np.full(n, -1, dtype=np.int32)
+        new_index[keep] = np.arange(len(keep), dtype=np.int32)
+        # every original pairing resolves to its kept representative
+        rep = [int(new_index[best[k]]) for k in keys]
+
+        mask = new_index[self.leg_pairings] >= 0
+        self._build_leg_csr(leg_ids[mask], new_index[self.leg_pairings[mask]])
+
+        self.pairings = [self.pairings[j] for j in keep]
+        for new_idx, p in enumerate(self.pairings):
+            p["pairing_index"] = new_idx
+        self.c = [self.c[j] for j in keep]
+        self.orig_to_index = {orig: rep[j] for orig, j in self.orig_to_index.items()}
+        self.initial = sorted({rep[j] for j in self.initial})
+        self.unresolved_legs = {int(new_index[j]): legs for j, legs in self.unresolved_legs.items() if new_index[j] >= 0}
+        self.n = len(keep)
+
+        print(f"Removed {n - self.n} duplicate pairings ({self.n} remain)")
+
     # ============================================================
     #  Solve Set-Partitioning Problem
     # ============================================================
-    def solve_spp(self):
+    def solve_spp(self, use_cbc=False):
         """
-        Builds and solves the Set Partitioning Problem using a binary linear program. Pulp in this case.
-        The objective minimizes total pairing cost subject to exact coverage of every leg. Solution parsing is 
-        restricted to optimal solver outcomes to avoid propagating infeasible or partial results.
+        Builds and solves the Set Partitioning Problem as a binary linear program.
+        HiGHS (via highspy) is used when installed, handing it the CSR incidence directly; set use_cbc=True, or run
+        without highspy, to go through PuLP + CBC instead. The objective minimizes total pairing cost subject to exact
+        coverage of every leg. The LP relaxation is solved first; on well-structured pairing instances it is often
+        already integral, in which case it is optimal for the SPP and branch-and-bound is skipped. Otherwise the integer
+        program is solved, with the pairings flagged is_initial in pairings.csv passed as a MIP start when present. Solution
+        parsing is restricted to optimal solver outcomes to avoid propagating infeasible or partial results.
+        Returns the selected pairings' pairing_index values as given in pairings.csv (their file row when the file has
+        no index column).
         """
-        if self.a is None:
+        if self.leg_indptr is None:
             self.infer_incidence()
 
         if not self.c or len(self.c) != self.n:
             self.load_costs_csv()
 
-        prob = pulp.LpProblem("SPP", pulp.LpMinimize)
-        x = [pulp.LpVariable(f"x_{j}", cat="Binary") for j in range(self.n)]
+        solve = self._solve_cbc if use_cbc or highspy is None else self._solve_highs
 
-        # objective
-        prob += pulp.lpSum(self.c[j] * x[j] for j in range(self.n))
+        print("Solving LP relaxation...")
+        status, obj_value, values = solve(relax=True)
 
-        # constraints: each leg exactly once
-        for i in range(self.m):
-            prob += pulp.lpSum(self.a[i][j] * x[j] for j in range(self.n)) == 1
-
-        print("Solving...")
-        prob.solve(pulp.PULP_CBC_CMD(msg=0))
+        # an infeasible relaxation means the SPP is infeasible too
+        if status == "Optimal" and all(abs(v - round(v)) < 1e-6 for v in values):
+            print("LP relaxation is integral; skipping branch-and-bound.")
+        elif status != "Infeasible":
+            print("Solving...")
+            status, obj_value, values = solve()
 
-        status = pulp.LpStatus[prob.status]
         print("Status:", status)
 
         # FIXED: Only process solution if optimal
         if status == "Optimal":
-            obj_value = pulp.value(prob.objective)
             print("Objective value:", obj_value)
 
-            solution = [int(pulp.value(x[j])) for j in range(self.n)]
-            selected = [j for j, val in enumerate(solution) if val == 1]
+            selected = [j for j, val in enumerate(values) if round(val) == 1]
 
             print(f"\nSelected {len(selected)} pairings out of {self.n}")
-            return selected
+            # report pairings by their pairings.csv index, not the internal position
+            return sorted(self.pairings[j]["orig_index"] for j in selected)
         else:
             print("Problem is not optimal. No solution available.")
             print("\nDiagnosing infeasibility...")
             self.diagnose_infeasibility()
             return []
 
+    def _solve_cbc(self, relax=False):
+        """
+        Solves the SPP (or its LP relaxation if relax=True) through PuLP's CBC interface.
+        Returns (status, objective, column values).
+        """
+        prob = pulp.LpProblem("SPP", pulp.LpMinimize)
+        if relax:
+            x = [pulp.LpVariable(f"x_{j}", lowBound=0, upBound=1, cat="Continuous") for j in range(self.n)]
+        else:
+            x = [pulp.LpVariable(f"x_{j}", cat="Binary") for j in range(self.n)]
+
+        # objective
+        prob += pulp.LpAffineExpression(list(zip(x, self.c)))
+
+        # constraints: each leg exactly once, built from the leg's nonzeros only
+        indptr, leg_pairings = self.leg_indptr, self.leg_pairings
+        for i in range(self.m):
+            expr = pulp.LpAffineExpression([(x[j], 1) for j in leg_pairings[indptr[i]:indptr[i + 1]].tolist()])
+            prob += (expr == 1, f"cov_{i}")
+
+        # MIP start from the initial solution
+        warm_start = bool(self.initial) and not relax
+        if warm_start:
+            for v in x:
+                v.setInitialValue(0)
+            for j in self.initial:
+                x[j].setInitialValue(1)
+
+        prob.solve(pulp.PULP_CBC_CMD(msg=0, warmStart=warm_start))
+
+        status = pulp.LpStatus[prob.status]
+        if status != "Optimal":
+            return status, None, []
+        return status, pulp.value(prob.objective), [pulp.value(v) for v in x]
+
+    def _solve_highs(self, relax=False):
+        """
+        Solves the SPP (or its LP relaxation if relax=True) in-process with HiGHS. The leg CSR arrays are exactly
+        HiGHS's row-wise constraint layout, so no LP file is written and no solver output has to be parsed.
+        Returns (status, objective, column values).
+        """
+        n, m = self.n, self.m
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", False)
+        # prove optimality like CBC does; the default 1e-4 gap still reports kOptimal
+        h.setOptionValue("mip_rel_gap", 0.0)
+
+        # binary columns: integer in [0, 1] (continuous for the relaxation)
+        h.addCols(n, np.asarray(self.c, dtype=np.float64), np.zeros(n), np.ones(n),
+                  0, np.zeros(n, dtype=np.int32), np.array([], dtype=np.int32), np.array([], dtype=np.float64))
+        if not relax:
+            h.changeColsIntegrality(n, np.arange(n, dtype=np.int32),
+                                    np.full(n, highspy.HighsVarType.kInteger))
+
+        # rows: each leg exactly once
+        indices = self.leg_pairings
+        h.addRows(m, np.ones(m), np.ones(m), len(indices), self.leg_indptr[:-1], indices, np.ones(len(indices)))
+
+        # MIP start from the initial solution
+        if self.initial and not relax:
+            start = highspy.HighsSolution()
+            col_value = np.zeros(n)
+            col_value[self.initial] = 1.0
+            start.col_value = col_value.tolist()
+            h.setSolution(start)
+
+        h.run()
+
+        model_status = h.getModelStatus()
+        if model_status != highspy.HighsModelStatus.kOptimal:
+            return h.modelStatusToString(model_status), None, []
+        return "Optimal", h.getInfo().objective_function_value, list(h.getSolution().col_value)
+
     # ============================================================
     #  Diagnose Infeasibility
     # ============================================================
@@ -320,12 +516,9 @@ class SPPFromCSV:
         Performs simple structural diagnostics when the SPP is infeasible.
         Identifies legs that are not covered by any pairing and reports coverage multiplicity for sanity checking the incidence structure.
         """
-        uncoverable_legs = []
-
-        for i in range(self.m):
-            # Check if leg i appears in any pairing
-            if sum(self.a[i][j] for j in range(self.n)) == 0:
-                uncoverable_legs.append(i)
+        # per-leg coverage counts, computed once for both checks
+        row_sums = np.diff(self.leg_indptr)
+        uncoverable_legs = np.flatnonzero(row_sums == 0).tolist()
 
         if uncoverable_legs:
             print(f"\nFound {len(uncoverable_legs)} legs that don't appear in any pairing:")
@@ -335,15 +528,11 @@ class SPPFromCSV:
                 print(f"  ... and {len(uncoverable_legs) - 10} more")
 
         # Check for legs that appear in multiple pairings (good for debugging)
-        multi_coverage = []
-        for i in range(self.m):
-            count = sum(self.a[i][j] for j in range(self.n))
-            if count > 1:
-                multi_coverage.append((i, count))
+        multi_coverage = np.flatnonzero(row_sums > 1)
 
-        if multi_coverage:
+        if len(multi_coverage):
             print(f"\n{len(multi_coverage)} legs appear in multiple pairings (this is OK)")
-            print(f"Average coverage: {sum(c for _, c in multi_coverage) / len(multi_coverage):.2f} pairings per leg")
+            print(f"Average coverage: {row_sums[multi_coverage].mean():.2f} pairings per leg")
 
     # ============================================================
     #  Convenience Pipeline
@@ -357,6 +546,7 @@ class SPPFromCSV:
             self.infer_incidence()
 
         self.load_costs_csv()
+        self.dedupe_pairings()
         return self.solve_spp()
 
 